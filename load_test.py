@@ -0,0 +1,501 @@
+"""
+Concurrent-session load test for DecodEd.
+
+Starts one real `streamlit run main.py` server and connects N headless clients
+to it over Streamlit's websocket protocol, the same way N browser tabs would.
+Every client runs the Dashboard -> PDF upload -> Editor Run -> Active Quiz flow
+at the same time, so all sessions share one process: one GIL, one my_notes.json
+and one set of blocking `generate_content` calls. Gemini calls go to a local
+fake endpoint with configurable latency, so no API key or network access is
+needed.
+
+Each load level in --users gets a fresh server, and the report shows how
+throughput, rerun latency and server memory change as N grows.
+
+Usage:
+    python load_test.py --users 1,5,10,20 --latency 1.5 --rounds 2
+
+Needs the `websockets` package (installed with recent Streamlit versions).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+FAKE_MODEL = "models/gemini-1.5-flash"
+SERVER_START_TIMEOUT = 60
+
+SAMPLE_TEXT = [
+    "Photosynthesis converts light energy into chemical energy.",
+    "Chlorophyll in the chloroplast absorbs red and blue light.",
+    "The quadratic formula solves ax^2 + bx + c = 0.",
+    "The discriminant b^2 - 4ac decides the number of real roots.",
+]
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for the Gemini REST API.
+    Answers list_models and generateContent, sleeping `latency` seconds per generation.
+    """
+
+    latency = 1.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_json(
+            {
+                "models": [
+                    {
+                        "name": FAKE_MODEL,
+                        "baseModelId": "gemini-1.5-flash",
+                        "version": "001",
+                        "displayName": "Fake Gemini",
+                        "description": "Load test stub",
+                        "inputTokenLimit": 1000000,
+                        "outputTokenLimit": 8192,
+                        "supportedGenerationMethods": ["generateContent"],
+                    }
+                ]
+            }
+        )
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        prompt = self.rfile.read(length).decode("utf-8")
+        time.sleep(self.latency)
+
+        if "Multiple Choice" in prompt:
+            text = json.dumps(
+                [
+                    {
+                        "question": f"Question {i + 1}?",
+                        "options": ["A", "B", "C", "D"],
+                        "answer": "A",
+                    }
+                    for i in range(10)
+                ]
+            )
+        elif "flashcards" in prompt:
+            text = json.dumps([{"front": f"Term {i + 1}", "back": "Definition"} for i in range(10)])
+        else:
+            text = "## Summary\n- **Key term**: stub answer from the fake backend."
+
+        self.send_json(
+            {
+                "candidates": [
+                    {
+                        "content": {"parts": [{"text": text}], "role": "model"},
+                        "finishReason": "STOP",
+                        "index": 0,
+                    }
+                ]
+            }
+        )
+
+def start_fake_backend(latency):
+    FakeGeminiHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeminiHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_pdf(lines):
+    """
+    Builds a one-page text PDF by hand so the upload step needs no extra dependency.
+    """
+    stream = "BT /F1 12 Tf 50 750 Td 14 TL " + " ".join(
+        "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '"
+        for line in lines
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += f"{i + 1} 0 obj\n{obj}\nendobj\n"
+    xref_at = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+def seed_notes(count):
+    notes = [
+        {
+            "title": f"Seed Note {i + 1}",
+            "content": " ".join(SAMPLE_TEXT * 20),
+            "date": "2024-01-01",
+        }
+        for i in range(count)
+    ]
+    with open("my_notes.json", "w", encoding="utf-8") as f:
+        json.dump(notes, f, ensure_ascii=False, indent=2)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_app_server(port, endpoint):
+    """
+    Launches main.py under `streamlit run` in the current directory and waits until it is healthy.
+    Server output is discarded so the report is not buried in Streamlit warnings.
+    """
+    env = dict(os.environ, DECODED_GEMINI_ENDPOINT=endpoint)
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_FILE,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.enableXsrfProtection", "false",
+            "--browser.gatherUsageStats", "false",
+            "--logger.level", "error",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("streamlit server exited during startup")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("streamlit server did not become healthy in time")
+
+def process_rss_kib(pid):
+    """
+    Current resident memory of a process in KiB, or None if it cannot be read here.
+    Uses psutil when installed, otherwise Linux /proc.
+    """
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss // 1024
+    except ImportError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+class StudentClient:
+    """
+    One headless browser tab: a websocket session that sends widget interactions
+    and waits for the server to finish each rerun.
+    """
+
+    def __init__(self, port, timeout):
+        self.port = port
+        self.timeout = timeout
+        self.ws = None
+        self.session_id = None
+        self.widgets = {}
+        self.timings = []
+
+    async def connect(self):
+        self.ws = await websockets.connect(
+            f"ws://127.0.0.1:{self.port}/_stcore/stream",
+            subprotocols=["streamlit"],
+            max_size=None,
+        )
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def receive(self):
+        msg = ForwardMsg()
+        msg.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+        return msg
+
+    async def rerun(self, widget_states=()):
+        """
+        Sends one rerun and waits for the script to finish, following any st.rerun().
+        Records the widgets the final run rendered, keyed by label.
+        """
+        back = BackMsg()
+        back.rerun_script.query_string = ""
+        back.rerun_script.widget_states.widgets.extend(widget_states)
+        await self.ws.send(back.SerializeToString())
+
+        while True:
+            msg = await self.receive()
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+                self.widgets = {}
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    raise RuntimeError(f"app raised {element.exception.type}: {element.exception.message}")
+                proto = getattr(element, element_type)
+                if getattr(proto, "id", ""):
+                    self.widgets[proto.label or element_type] = proto.id
+            elif kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    return
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("app failed to compile")
+
+    async def step(self, name, widget_states=()):
+        start = time.perf_counter()
+        await self.rerun(widget_states)
+        self.timings.append((name, time.perf_counter() - start))
+
+    def widget_id(self, label):
+        if label not in self.widgets:
+            raise RuntimeError(f"widget {label!r} not on page, found {sorted(self.widgets)}")
+        return self.widgets[label]
+
+    def click(self, label):
+        return WidgetState(id=self.widget_id(label), trigger_value=True)
+
+    def value(self, label, **kwargs):
+        return WidgetState(id=self.widget_id(label), **kwargs)
+
+    async def upload(self, name, data):
+        """
+        Requests an upload URL over the websocket and PUTs the file, like the browser does.
+        Returns the file_uploader widget state that refers to the uploaded file.
+        """
+        request_id = uuid.uuid4().hex
+        back = BackMsg()
+        back.file_urls_request.request_id = request_id
+        back.file_urls_request.session_id = self.session_id
+        back.file_urls_request.file_names.append(name)
+        await self.ws.send(back.SerializeToString())
+
+        while True:
+            msg = await self.receive()
+            if msg.WhichOneof("type") == "file_urls_response" and msg.file_urls_response.response_id == request_id:
+                break
+        if msg.file_urls_response.error_msg:
+            raise RuntimeError(f"upload refused: {msg.file_urls_response.error_msg}")
+        urls = msg.file_urls_response.file_urls[0]
+
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+            f"Content-Type: application/pdf\r\n\r\n"
+        ).encode("utf-8") + data + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.port}{urls.upload_url}",
+            data=body,
+            method="PUT",
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        await asyncio.to_thread(urllib.request.urlopen, request, timeout=self.timeout)
+
+        state = self.value("Upload PDF")
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.name = name
+        info.size = len(data)
+        info.file_id = urls.file_id
+        info.file_urls.CopyFrom(urls)
+        return state
+
+async def run_flow(client, pdf_bytes):
+    """
+    One student pass: Dashboard -> PDF upload -> Editor Run (Quiz) -> Active Quiz.
+    """
+    await client.step("dashboard", [client.click("DASHBOARD")])
+    if "Enter Key" in client.widgets:
+        await client.step("enter_key", [client.value("Enter Key", string_value="load-test-key")])
+
+    start = time.perf_counter()
+    pdf_state = await client.upload("notes.pdf", pdf_bytes)
+    await client.rerun([pdf_state])
+    client.timings.append(("upload", time.perf_counter() - start))
+
+    await client.step("process_pdf", [pdf_state, client.click("Process PDF →")])
+    quiz_mode = client.value("Mode", string_value="Quiz")
+    await client.step("select_mode", [quiz_mode])
+    await client.step("editor_run", [quiz_mode, client.click("Run ➤")])
+    await client.step("back_to_editor", [client.click("← Back to Editor")])
+
+async def run_student(client, pdf_bytes, rounds):
+    """
+    Runs the flow `rounds` times on an already connected client.
+    Failures are returned rather than raised so one broken session can't stall the level.
+    """
+    result = {"client": client, "error": None, "started": time.perf_counter()}
+    try:
+        if client.ws is None:
+            raise RuntimeError("websocket connection failed")
+        await client.step("home")
+        for _ in range(rounds):
+            await run_flow(client, pdf_bytes)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["finished"] = time.perf_counter()
+    return result
+
+async def connect_students(port, count, timeout):
+    clients = [StudentClient(port, timeout) for _ in range(count)]
+    await asyncio.gather(*(c.connect() for c in clients), return_exceptions=True)
+    return clients
+
+async def run_level(users, args, pdf_bytes, endpoint):
+    """
+    Runs `users` concurrent students against a fresh server and returns the level's numbers.
+    """
+    port = free_port()
+    server = start_app_server(port, endpoint)
+    timeout = args.latency * 4 + 60
+    try:
+        # Untimed session so imports, model lookup and the notes cache are warm.
+        warmup_client = (await connect_students(port, 1, timeout))[0]
+        warmup = await run_student(warmup_client, pdf_bytes, 1)
+        await warmup_client.close()
+        if warmup["error"]:
+            return {
+                "users": users,
+                "timings": [],
+                "errors": [f"warm-up session failed: {warmup['error']}"] * users,
+                "elapsed": 0,
+                "flows": 0,
+                "rss_per_session": None,
+            }
+
+        rss_before = process_rss_kib(server.pid)
+        # Connect everyone first so all flows start at the same moment.
+        clients = await connect_students(port, users, timeout)
+        results = await asyncio.gather(*(run_student(c, pdf_bytes, args.rounds) for c in clients))
+
+        # Measure while every session is still connected and holding its state.
+        rss_after = process_rss_kib(server.pid)
+        for r in results:
+            await r["client"].close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    timings = [t for r in results for t in r["client"].timings]
+    errors = [r["error"] for r in results if r["error"]]
+    elapsed = max(r["finished"] for r in results) - min(r["started"] for r in results)
+    return {
+        "users": users,
+        "timings": timings,
+        "errors": errors,
+        "elapsed": elapsed,
+        "flows": (users - len(errors)) * args.rounds,
+        "rss_per_session": (rss_after - rss_before) / users if rss_before and rss_after else None,
+    }
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def print_report(args, levels):
+    print(f"\nFake LLM latency: {args.latency}s  Rounds: {args.rounds}  Seed notes: {args.notes}")
+    print("Latency columns are seconds per rerun, across all steps.\n")
+    print(
+        f"{'users':>6}{'flows':>7}{'failed':>8}{'flows/s':>9}{'reruns/s':>10}"
+        f"{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}{'MiB/session':>13}"
+    )
+    for level in levels:
+        durations = [d for _, d in level["timings"]] or [0]
+        elapsed = level["elapsed"] or 1
+        memory = level["rss_per_session"]
+        print(
+            f"{level['users']:>6}{level['flows']:>7}{len(level['errors']):>8}"
+            f"{level['flows'] / elapsed:>9.2f}{len(level['timings']) / elapsed:>10.2f}"
+            f"{percentile(durations, 50):>8.3f}{percentile(durations, 90):>8.3f}"
+            f"{percentile(durations, 99):>8.3f}{max(durations):>8.3f}"
+            f"{(f'{memory / 1024:.2f}' if memory is not None else 'n/a'):>13}"
+        )
+
+    last = levels[-1]
+    if last["timings"]:
+        print(f"\nPer step at {last['users']} users:")
+        print(f"{'step':<16}{'count':>7}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+        for step in dict.fromkeys(step for step, _ in last["timings"]):
+            values = [d for s, d in last["timings"] if s == step]
+            print(
+                f"{step:<16}{len(values):>7}{statistics.mean(values):>9.3f}"
+                f"{percentile(values, 50):>9.3f}{percentile(values, 90):>9.3f}"
+                f"{percentile(values, 99):>9.3f}{max(values):>9.3f}"
+            )
+
+    for level in levels:
+        for error in level["errors"][:3]:
+            print(f"Error ({level['users']} users): {error}")
+
+    print("\nMiB/session is the server's RSS growth with all sessions connected, divided by users.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for DecodEd.")
+    parser.add_argument("--users", default="1,5,10", help="comma-separated concurrent session counts")
+    parser.add_argument("--rounds", type=int, default=1, help="flows per session")
+    parser.add_argument("--latency", type=float, default=1.0, help="fake Gemini latency in seconds")
+    parser.add_argument("--notes", type=int, default=20, help="notes seeded into my_notes.json")
+    args = parser.parse_args()
+    user_levels = [int(n) for n in args.users.split(",") if n.strip()]
+
+    backend = start_fake_backend(args.latency)
+    endpoint = f"http://127.0.0.1:{backend.server_address[1]}"
+    pdf_bytes = make_pdf(SAMPLE_TEXT)
+
+    workdir = tempfile.TemporaryDirectory()
+    os.chdir(workdir.name)
+    try:
+        levels = []
+        for users in user_levels:
+            # Reset the shared notebook so every level starts from the same library.
+            seed_notes(args.notes)
+            print(f"Running {users} concurrent users...", flush=True)
+            levels.append(asyncio.run(run_level(users, args, pdf_bytes, endpoint)))
+        print_report(args, levels)
+    finally:
+        backend.shutdown()
+        os.chdir(os.path.dirname(APP_FILE))
+        workdir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import streamlit as st
 import pypdf
 import os
+import math
+import unicodedata
 import json
 import datetime
 import google.generativeai as genai
@@ -9,6 +11,13 @@ st.set_page_config(page_title="DecodEd", page_icon="⚡", layout="wide")
 
 NOTES_FILE = "my_notes.json"
 MAX_PDF_PAGES = 40
+ASK_MODE = "Ask My Notes"
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 30
+ASK_TOP_K = 6
+ASK_TOKEN_BUDGET = 1500
+# Points the Gemini client at another host (e.g. the fake backend in load_test.py).
+GEMINI_ENDPOINT = os.environ.get("DECODED_GEMINI_ENDPOINT")
 
 if "model_cache" not in st.session_state:
     st.session_state.model_cache = {}
@@ -47,6 +56,103 @@ def delete_note(title):
     with open(NOTES_FILE, "w", encoding="utf-8") as f:
         json.dump(notes, f, ensure_ascii=False, indent=2)
 
+def tokenize(text):
+    # Plain \w+ splits Indic words at vowel signs and viramas (Unicode marks), so keep marks in words.
+    text = "".join(
+        c if c.isalnum() or unicodedata.category(c).startswith("M") else " "
+        for c in text.lower()
+    )
+    return text.split()
+
+def estimate_tokens(text):
+    # Rough Gemini estimate: ~4 characters per token.
+    return len(text) // 4 + 1
+
+def chunk_note(content):
+    """
+    Splits a note into overlapping word windows so long notes
+    can be retrieved passage by passage.
+    """
+    words = content.split()
+    chunks = []
+    step = CHUNK_WORDS - CHUNK_OVERLAP
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + CHUNK_WORDS]))
+        if start + CHUNK_WORDS >= len(words):
+            break
+    return chunks
+
+def notes_version():
+    if not os.path.exists(NOTES_FILE):
+        return None
+    stat = os.stat(NOTES_FILE)
+    return (stat.st_mtime_ns, stat.st_size)
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def build_notes_index(version):
+    """
+    Builds an offline BM25 index over every saved note, one entry per chunk.
+    Cached on the notes file version so it is only rebuilt after a save or delete.
+    """
+    chunks = []
+    postings = {}
+    total_length = 0
+    for note in load_notes():
+        for passage in chunk_note(note.get("content", "")):
+            terms = tokenize(passage)
+            if not terms:
+                continue
+            chunk_id = len(chunks)
+            chunks.append({"title": note["title"], "text": passage, "length": len(terms)})
+            total_length += len(terms)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((chunk_id, tf))
+
+    return {
+        "chunks": chunks,
+        "postings": postings,
+        "avg_length": total_length / len(chunks) if chunks else 0,
+    }
+
+def retrieve_passages(index, question, k1=1.5, b=0.75):
+    """
+    Scores chunks against the question with BM25 and returns the best ones
+    that fit inside ASK_TOKEN_BUDGET, highest score first.
+    """
+    chunks = index["chunks"]
+    if not chunks:
+        return []
+
+    scores = {}
+    for term in set(tokenize(question)):
+        matches = index["postings"].get(term)
+        if not matches:
+            continue
+        idf = math.log(1 + (len(chunks) - len(matches) + 0.5) / (len(matches) + 0.5))
+        for chunk_id, tf in matches:
+            norm = k1 * (1 - b + b * chunks[chunk_id]["length"] / index["avg_length"])
+            scores[chunk_id] = scores.get(chunk_id, 0) + idf * tf * (k1 + 1) / (tf + norm)
+
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    passages = []
+    used_tokens = 0
+    for chunk_id in ranked:
+        cost = estimate_tokens(chunks[chunk_id]["text"])
+        if used_tokens + cost > ASK_TOKEN_BUDGET:
+            continue
+        passages.append(chunks[chunk_id])
+        used_tokens += cost
+        if len(passages) >= ASK_TOP_K:
+            break
+    return passages
+
+def build_ask_prompt(question, passages):
+    blocks = [f"[NOTE: {p['title']}]\n{p['text']}" for p in passages]
+    return "\n\n".join(blocks) + f"\n\n[QUESTION]:\n{question}"
+
 def get_system_prompt(mode):
     """
     Returns specific instructions based on the selected mode.
@@ -82,6 +188,15 @@ def get_system_prompt(mode):
             "Format: [{'front': 'Concept/Term', 'back': 'Definition/Explanation'}]"
         )
 
+    elif mode == ASK_MODE:
+        return (
+            f"{base_instruction} "
+            "The source material is a set of passages retrieved from the student's notebook, "
+            "each labelled with its note title. Answer the question at the end using only these passages. "
+            "Cite the note title in square brackets after each fact, e.g. [Photosynthesis]. "
+            "If the passages do not contain the answer, say so."
+        )
+
     else:
         return base_instruction
 
@@ -97,7 +212,14 @@ def get_ai_response(api_key, user_text, mode):
         return "Error: Input text is empty."
 
     try:
-        genai.configure(api_key=api_key)
+        if GEMINI_ENDPOINT:
+            genai.configure(
+                api_key=api_key,
+                transport="rest",
+                client_options={"api_endpoint": GEMINI_ENDPOINT},
+            )
+        else:
+            genai.configure(api_key=api_key)
 
         if "target_model" not in st.session_state.model_cache:
             try:
@@ -393,7 +515,7 @@ elif st.session_state.page == "Dashboard":
             st.subheader("📥 Upload PDF")
             st.caption("Extract text from syllabus documents automatically.")
             uploaded_file = st.file_uploader(
-                "", type=["pdf"], label_visibility="collapsed"
+                "Upload PDF", type=["pdf"], label_visibility="collapsed"
             )
             if uploaded_file and st.button(
                 "Process PDF →",
@@ -541,16 +663,45 @@ elif st.session_state.page == "Editor":
         tool_col, run_col = st.columns([3, 1])
         with tool_col:
             mode = st.selectbox(
-                "Mode", ["Summary", "Quiz", "Flashcards"], label_visibility="collapsed"
+                "Mode", ["Summary", "Quiz", "Flashcards", ASK_MODE], label_visibility="collapsed"
             )
         with run_col:
             run_btn = st.button("Run ➤", type="primary", use_container_width=True)
 
+        if mode == ASK_MODE:
+            ask_question = st.text_input(
+                "Question",
+                label_visibility="collapsed",
+                placeholder="Ask a question across all your saved notes...",
+            )
+
         output_container = st.container(border=True)
         with output_container:
             if run_btn:
                 if not st.session_state.api_key:
                     st.error("Missing API Key. Please go to Settings.")
+                elif mode == ASK_MODE:
+                    if not ask_question.strip():
+                        st.warning("Please type a question first.")
+                    else:
+                        with st.spinner("Searching your notes..."):
+                            index = build_notes_index(notes_version())
+                            passages = retrieve_passages(index, ask_question)
+                        if not passages:
+                            st.warning("No saved notes match this question. Save some notes first.")
+                        else:
+                            with st.spinner(f"Answering from {len(passages)} passages..."):
+                                response_data = get_ai_response(
+                                    st.session_state.api_key,
+                                    build_ask_prompt(ask_question, passages),
+                                    mode,
+                                )
+                            if response_data.startswith("Error"):
+                                st.error(response_data)
+                            else:
+                                st.markdown(response_data)
+                                sources = list(dict.fromkeys(p["title"] for p in passages))
+                                st.caption("Sources: " + ", ".join(sources))
                 elif not user_text:
                     st.warning("Please enter some text or upload a PDF first.")
                 else: